@@ -3,6 +3,17 @@ import argparse
 import os
 
 
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def main():
     """Main entry point for the package."""
     parser = argparse.ArgumentParser(description="Run MCP SSE-based server")
@@ -11,6 +22,9 @@ def main():
     parser.add_argument("--key-file", help="BigQuery Service Account", required=False)
     parser.add_argument("--host", default="0.0.0.0", help="Host to bind to")
     parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument(
+        "--pool-size", type=positive_int, help="BigQuery HTTP connection pool size"
+    )
     args = parser.parse_args()
 
     # Get values from environment variables if not provided as arguments
@@ -19,4 +33,10 @@ def main():
     key_file = args.key_file or os.environ.get("BIGQUERY_KEY_FILE")
     host = args.host
     port = args.port
-    server.main(project, location, key_file, host, port)
+    pool_size = args.pool_size
+    if pool_size is None:
+        try:
+            pool_size = positive_int(os.environ.get("BIGQUERY_POOL_SIZE", "64"))
+        except argparse.ArgumentTypeError as e:
+            parser.error(f"BIGQUERY_POOL_SIZE: {e}")
+    server.main(project, location, key_file, host, port, pool_size)
@@ -1,10 +1,22 @@
-import csv
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Optional
-
-from google.cloud import bigquery
+from typing import Any, Iterable, Iterator, Optional
+
+import pyarrow as pa
+import requests
+from cachetools import TTLCache
+from google.api_core.exceptions import Forbidden, NotFound
+from google.cloud import bigquery, bigquery_storage
+from google.cloud.bigquery.dbapi._helpers import bigquery_scalar_type
+from pyarrow import csv as pacsv
 from google.oauth2 import service_account
 
 # Set up logging to both stdout and file
@@ -17,21 +29,321 @@ formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(messag
 handler_stdout.setFormatter(formatter)
 handler_file.setFormatter(formatter)
 
-# Add both handlers to logger
-logger.addHandler(handler_stdout)
-logger.addHandler(handler_file)
+# Route records through a queue so the stream/file writes happen on a
+# background thread instead of the thread serving the request
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(
+    log_queue, handler_stdout, handler_file, respect_handler_level=True
+)
+logger.addHandler(logging.handlers.QueueHandler(log_queue))
+log_listener.start()
+atexit.register(log_listener.stop)
 
 # Set overall logging level
-logger.setLevel(logging.DEBUG)
+log_level = os.environ.get("LOG_LEVEL", "INFO").upper()
+if log_level in logging.getLevelNamesMapping():
+    logger.setLevel(log_level)
+else:
+    logger.setLevel(logging.INFO)
+    logger.warning(f"Unknown LOG_LEVEL {log_level!r}, using INFO")
 
 logger.info("Starting MCP BigQuery Server")
 
+# Statement types that can change what list_tables/describe_table would return
+_DDL_STATEMENT_PREFIXES = ("CREATE_", "DROP_", "ALTER_")
+
+# Last query results larger than this are spilled to an Arrow IPC file;
+# smaller ones stay in memory so probes and DML results skip the disk write
+_SPILL_THRESHOLD_BYTES = 32 << 20
+
+QueryParams = (
+    dict[str, Any] | list[bigquery.ScalarQueryParameter | bigquery.ArrayQueryParameter]
+)
+
+# Arrow's vectorized CSV writer is used for every export; rows are formatted
+# in large chunks and written through a 1 MiB buffer to keep syscalls rare
+_CSV_WRITE_OPTIONS = pacsv.WriteOptions(include_header=True, batch_size=8192)
+_CSV_BUFFER_SIZE = 1 << 20
+
+
+def split_table_name(table_name: str) -> tuple[str, str]:
+    """Split [project.]dataset.table into its dataset part and table id"""
+    parts = table_name.split(".")
+    if len(parts) != 2 and len(parts) != 3:
+        raise ValueError(f"Invalid table name: {table_name}")
+    return ".".join(parts[:-1]), parts[-1]
+
+
+def _param_type(name: str, value: Any) -> str:
+    if value is None:
+        return "STRING"
+    # Same inference as the DB-API: naive datetimes are DATETIME, Decimals
+    # beyond NUMERIC's range are BIGNUMERIC and subclasses are accepted
+    param_type = bigquery_scalar_type(value)
+    if param_type is None:
+        raise ValueError(
+            f"Unsupported type for query parameter '{name}': {type(value).__name__}"
+        )
+    return param_type
+
+
+def _normalize_params(
+    params: QueryParams | None,
+) -> list[bigquery.ScalarQueryParameter | bigquery.ArrayQueryParameter]:
+    """Turn a name->value dict, a parameter list or None into a parameter list"""
+    if not params:
+        return []
+    if not isinstance(params, dict):
+        return list(params)
+
+    normalized = []
+    for name, value in params.items():
+        if isinstance(value, (list, tuple)):
+            element_type = _param_type(
+                name, next((v for v in value if v is not None), None)
+            )
+            normalized.append(
+                bigquery.ArrayQueryParameter(name, element_type, list(value))
+            )
+        else:
+            normalized.append(
+                bigquery.ScalarQueryParameter(name, _param_type(name, value), value)
+            )
+    return normalized
+
+
+def _query_job_config(
+    params: list[bigquery.ScalarQueryParameter | bigquery.ArrayQueryParameter],
+) -> bigquery.QueryJobConfig:
+    # Not cached: client.query() deep-copies whatever config it is given, so
+    # reusing an instance would not avoid the per-call copy anyway
+    return bigquery.QueryJobConfig(query_parameters=params, use_query_cache=True)
+
+
+# Legacy SQL type names reported by the tables API, mapped to GoogleSQL names
+_STANDARD_SQL_TYPES = {
+    "INTEGER": "INT64",
+    "FLOAT": "FLOAT64",
+    "BOOLEAN": "BOOL",
+    "RECORD": "STRUCT",
+}
+
+# Table types _render_ddl handles; others (EXTERNAL, SNAPSHOT, ...) are
+# described from INFORMATION_SCHEMA instead
+_RENDERABLE_TABLE_TYPES = ("TABLE", "VIEW", "MATERIALIZED_VIEW")
+
+
+def _quote(identifier: str) -> str:
+    return "`" + identifier.replace("\\", "\\\\").replace("`", "\\`") + "`"
+
+
+def _render_options(options: list[tuple[str, str]]) -> str:
+    return "OPTIONS(" + ", ".join(f"{name}={value}" for name, value in options) + ")"
+
+
+def _render_field_type(field: bigquery.SchemaField) -> str:
+    field_type = _STANDARD_SQL_TYPES.get(field.field_type, field.field_type)
+    if field_type == "STRUCT":
+        field_type = (
+            "STRUCT<" + ", ".join(_render_column(f) for f in field.fields) + ">"
+        )
+    elif field_type == "RANGE" and field.range_element_type is not None:
+        field_type = f"RANGE<{field.range_element_type.element_type}>"
+    elif field.precision is not None:
+        scale = f", {field.scale}" if field.scale is not None else ""
+        field_type = f"{field_type}({field.precision}{scale})"
+    elif field.max_length is not None:
+        field_type = f"{field_type}({field.max_length})"
+
+    if field.mode == "REPEATED":
+        return f"ARRAY<{field_type}>"
+    return field_type
+
+
+def _render_column(field: bigquery.SchemaField) -> str:
+    column = f"{_quote(field.name)} {_render_field_type(field)}"
+    if field.default_value_expression:
+        column += f" DEFAULT {field.default_value_expression}"
+    if field.mode == "REQUIRED":
+        column += " NOT NULL"
+    if field.description:
+        description = json.dumps(field.description)
+        column += " " + _render_options([("description", description)])
+    return column
+
+
+def _has_unrendered_column_options(fields: Iterable[bigquery.SchemaField]) -> bool:
+    return any(
+        field.rounding_mode
+        or (field.policy_tags and field.policy_tags.names)
+        or _has_unrendered_column_options(field.fields)
+        for field in fields
+    )
+
+
+def _can_render_ddl(table: bigquery.Table) -> bool:
+    """Whether _render_ddl covers everything INFORMATION_SCHEMA would show"""
+    if table.table_type not in _RENDERABLE_TABLE_TYPES:
+        return False
+    # Constraints, max_staleness, rounding modes and policy tags are not
+    # rendered, so tables using them keep the server-generated DDL
+    if table.table_constraints is not None or table.max_staleness is not None:
+        return False
+    return not _has_unrendered_column_options(table.schema)
+
+
+def _render_partitioning(table: bigquery.Table) -> str | None:
+    if table.range_partitioning is not None:
+        spec = table.range_partitioning
+        bounds = f"{spec.range_.start}, {spec.range_.end}, {spec.range_.interval}"
+        return f"RANGE_BUCKET({_quote(spec.field)}, GENERATE_ARRAY({bounds}))"
+
+    partitioning = table.time_partitioning
+    if partitioning is None:
+        return None
+    if partitioning.field is None:
+        if partitioning.type_ == "DAY":
+            return "_PARTITIONDATE"
+        return f"TIMESTAMP_TRUNC(_PARTITIONTIME, {partitioning.type_})"
+
+    column = _quote(partitioning.field)
+    column_types = {field.name: field.field_type for field in table.schema}
+    column_type = column_types.get(partitioning.field, "TIMESTAMP")
+    if partitioning.type_ == "DAY":
+        if column_type == "DATE":
+            return column
+        return f"DATE({column})"
+    return f"{column_type}_TRUNC({column}, {partitioning.type_})"
+
+
+def _render_table_options(table: bigquery.Table) -> list[tuple[str, str]]:
+    options = []
+    if table.mview_enable_refresh is not None:
+        enable_refresh = "true" if table.mview_enable_refresh else "false"
+        options.append(("enable_refresh", enable_refresh))
+    if table.mview_refresh_interval is not None:
+        minutes = table.mview_refresh_interval.total_seconds() / 60
+        options.append(("refresh_interval_minutes", repr(minutes)))
+    if table.expires is not None:
+        options.append(
+            ("expiration_timestamp", f'TIMESTAMP "{table.expires.isoformat()}"')
+        )
+    partitioning = table.time_partitioning
+    if partitioning is not None and partitioning.expiration_ms is not None:
+        days = partitioning.expiration_ms / 86_400_000
+        options.append(("partition_expiration_days", repr(days)))
+    if table.require_partition_filter:
+        options.append(("require_partition_filter", "true"))
+    encryption = table.encryption_configuration
+    if encryption is not None and encryption.kms_key_name:
+        options.append(("kms_key_name", json.dumps(encryption.kms_key_name)))
+    if table.friendly_name:
+        options.append(("friendly_name", json.dumps(table.friendly_name)))
+    if table.description:
+        options.append(("description", json.dumps(table.description)))
+    if table.labels:
+        labels = ", ".join(
+            f"({json.dumps(key)}, {json.dumps(value)})"
+            for key, value in sorted(table.labels.items())
+        )
+        options.append(("labels", f"[{labels}]"))
+    return options
+
+
+def _render_ddl(table: bigquery.Table) -> str:
+    """Render a CREATE statement for a TABLE, VIEW or MATERIALIZED_VIEW"""
+    table_ref = _quote(f"{table.project}.{table.dataset_id}.{table.table_id}")
+    options = _render_table_options(table)
+
+    if table.table_type in ("VIEW", "MATERIALIZED_VIEW"):
+        kind = "VIEW" if table.table_type == "VIEW" else "MATERIALIZED VIEW"
+        query = table.view_query if table.table_type == "VIEW" else table.mview_query
+        ddl = f"CREATE {kind} {table_ref}"
+        if options:
+            ddl += "\n" + _render_options(options)
+        return ddl + f"\nAS {query};"
+
+    columns = ",\n".join(f"  {_render_column(field)}" for field in table.schema)
+    ddl = f"CREATE TABLE {table_ref}\n(\n{columns}\n)"
+    partitioning = _render_partitioning(table)
+    if partitioning:
+        ddl += f"\nPARTITION BY {partitioning}"
+    if table.clustering_fields:
+        clustering = ", ".join(_quote(field) for field in table.clustering_fields)
+        ddl += f"\nCLUSTER BY {clustering}"
+    if options:
+        ddl += "\n" + _render_options(options)
+    return ddl + ";"
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError as e:
+        logger.warning(f"Could not remove temporary file {path}: {e}")
+
+
+def _stringify_nested_columns(batch: pa.RecordBatch) -> pa.RecordBatch:
+    """JSON-encode REPEATED/RECORD columns, which Arrow's CSV writer rejects"""
+    if not any(pa.types.is_nested(field.type) for field in batch.schema):
+        return batch
+
+    columns = []
+    for column, field in zip(batch.columns, batch.schema):
+        if pa.types.is_nested(field.type):
+            column = pa.array(
+                [
+                    None if value is None else json.dumps(value, default=str)
+                    for value in column.to_pylist()
+                ],
+                pa.string(),
+            )
+        columns.append(column)
+    return pa.RecordBatch.from_arrays(columns, names=batch.schema.names)
+
+
+def _write_batches_to_csv(
+    file_path: str,
+    batches: Iterable[pa.RecordBatch],
+    column_names: list[str],
+) -> int:
+    """Stream Arrow record batches into a CSV file and return the row count"""
+    writer: pacsv.CSVWriter | None = None
+    row_count = 0
+    with pa.output_stream(file_path, buffer_size=_CSV_BUFFER_SIZE) as sink:
+        try:
+            for batch in batches:
+                batch = _stringify_nested_columns(batch)
+                if writer is None:
+                    writer = pacsv.CSVWriter(
+                        sink, batch.schema, write_options=_CSV_WRITE_OPTIONS
+                    )
+                writer.write_batch(batch)
+                row_count += batch.num_rows
+
+            if writer is None:
+                # No batches at all: still emit the header row
+                empty = pa.table(
+                    {name: pa.array([], pa.string()) for name in column_names}
+                )
+                pacsv.write_csv(empty, sink, write_options=_CSV_WRITE_OPTIONS)
+        finally:
+            if writer is not None:
+                writer.close()
+    return row_count
+
 
 class BigQueryDatabase:
-    def __init__(self, project: str, location: str, key_file: Optional[str]):
+    def __init__(
+        self,
+        project: str,
+        location: str,
+        key_file: Optional[str],
+        pool_size: int = 64,
+    ):
         """Initialize a BigQuery database client"""
         logger.info(
-            f"Initializing BigQuery client for project: {project}, location: {location}, key_file: {key_file}"
+            f"Initializing BigQuery client for project: {project}, location: {location}, key_file: {key_file}, pool_size: {pool_size}"
         )
         if not project:
             raise ValueError("Project is required")
@@ -53,35 +365,157 @@ class BigQueryDatabase:
         self.client = bigquery.Client(
             credentials=credentials, project=project, location=location
         )
-        self.last_query_results = None  # Store last query results for CSV conversion
+        # The default requests pool keeps only 10 connections, which is too few
+        # once many tool calls share this client concurrently
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=3
+        )
+        self.client._http.mount("https://", adapter)
+        self.client._http._auth_request.session.mount("https://", adapter)
+        # Storage Read API client for fast Arrow downloads of large results;
+        # created once so its gRPC channel is reused by every download
+        self._bqstorage = bigquery_storage.BigQueryReadClient(credentials=credentials)
+        # Cleared once the credentials turn out to lack Storage API access
+        self._use_bqstorage = True
+        # Last query results are spilled to an Arrow IPC file for CSV
+        # conversion; only its path and schema are kept in memory
+        self.last_query_results: dict[str, Any] | None = None
+        self._last_results_lock = threading.Lock()
+        atexit.register(self._discard_last_results)
+        # Table listings and DDL rarely change within a session; cache them
+        self._metadata_cache: TTLCache = TTLCache(maxsize=512, ttl=300)
+        self._cache_lock = threading.Lock()
+        # Fan-out pool for independent metadata RPCs (e.g. one per dataset)
+        self._metadata_executor = ThreadPoolExecutor(
+            max_workers=min(16, pool_size), thread_name_prefix="bigquery-metadata"
+        )
 
-    def execute_query(
-        self, query: str, params: dict[str, Any] | None = None
-    ) -> list[dict[str, Any]]:
-        """Execute a SQL query and return results as a list of dictionaries"""
+    def close(self) -> None:
+        """Release clients, worker threads and temporary files"""
+        logger.info("Closing BigQuery clients")
+        self._metadata_executor.shutdown(wait=False, cancel_futures=True)
+        self._bqstorage.transport.close()
+        self.client.close()
+        self._discard_last_results()
+
+    def invalidate_cache(self) -> None:
+        """Drop all cached table metadata"""
+        logger.debug("Invalidating metadata cache")
+        with self._cache_lock:
+            self._metadata_cache.clear()
+
+    def _get_cached(self, cache: TTLCache, key: Any) -> Any:
+        with self._cache_lock:
+            return cache.get(key)
+
+    def _set_cached(self, cache: TTLCache, key: Any, value: Any) -> None:
+        with self._cache_lock:
+            cache[key] = value
+
+    def _invalidate_cache_after(self, job: bigquery.QueryJob) -> None:
+        """Invalidate cached metadata if the finished job was DDL"""
+        statement_type = job.statement_type or ""
+        if statement_type == "SCRIPT" or statement_type.startswith(
+            _DDL_STATEMENT_PREFIXES
+        ):
+            self.invalidate_cache()
+
+    def execute_query(self, query: str, params: QueryParams | None = None) -> pa.Table:
+        """Execute a SQL query and return results as an Arrow table"""
+        table = self._run_query(query, params)
+
+        # Store the last query results for potential CSV conversion
+        self._store_last_results(table)
+        return table
+
+    def _run_query(self, query: str, params: QueryParams | None = None) -> pa.Table:
+        """Execute a SQL query without touching the last query results"""
         logger.debug(f"Executing query: {query}")
+        params = _normalize_params(params)
         try:
-            if params:
-                job = self.client.query(
-                    query, job_config=bigquery.QueryJobConfig(query_parameters=params)
-                )
-            else:
-                job = self.client.query(query)
-
-            results = job.result()
-            rows = [dict(row.items()) for row in results]
+            job = self.client.query(query, job_config=_query_job_config(params))
 
-            # Store the last query results for potential CSV conversion
-            self.last_query_results = {"rows": rows, "schema": results.schema}
+            table = self._download_arrow(job, job.result())
+            self._invalidate_cache_after(job)
 
-            logger.debug(f"Query returned {len(rows)} rows")
-            return rows
+            logger.debug(f"Query returned {table.num_rows} rows")
+            return table
         except Exception as e:
             logger.error(f"Database error executing query: {e}")
             raise
 
+    def _storage_api_denied(self, e: Forbidden) -> None:
+        # Permission on the Storage Read API does not change at runtime, so
+        # stop trying it rather than paying for a failed read session per query
+        logger.warning(
+            f"BigQuery Storage Read API not permitted, falling back to REST: {e}"
+        )
+        self._use_bqstorage = False
+
+    def _download_arrow(
+        self, job: bigquery.QueryJob, rows: bigquery.table.RowIterator
+    ) -> pa.Table:
+        """Download job results as Arrow, preferring the Storage Read API"""
+        if self._use_bqstorage:
+            try:
+                return rows.to_arrow(bqstorage_client=self._bqstorage)
+            except Forbidden as e:  # also covers gRPC PermissionDenied
+                self._storage_api_denied(e)
+        return job.result().to_arrow(create_bqstorage_client=False)
+
+    def _iter_arrow_batches(
+        self, job: bigquery.QueryJob, rows: bigquery.table.RowIterator
+    ) -> Iterator[pa.RecordBatch]:
+        """Stream job results as Arrow batches, preferring the Storage Read API"""
+        if self._use_bqstorage:
+            batches = rows.to_arrow_iterable(bqstorage_client=self._bqstorage)
+            try:
+                # The read session is created when the first batch is requested
+                first = next(batches, None)
+            except Forbidden as e:  # also covers gRPC PermissionDenied
+                self._storage_api_denied(e)
+            else:
+                if first is not None:
+                    yield first
+                yield from batches
+                return
+        yield from job.result().to_arrow_iterable()
+
+    def _store_last_results(self, table: pa.Table) -> None:
+        """Remember query results, spilling large ones to an Arrow IPC file"""
+        last_results: dict[str, Any] = {"table": table}
+        if table.nbytes > _SPILL_THRESHOLD_BYTES:
+            fd, path = tempfile.mkstemp(prefix="mcp_bq_last_results_", suffix=".arrow")
+            os.close(fd)
+            try:
+                with pa.ipc.new_file(path, table.schema) as writer:
+                    writer.write_table(table)
+                last_results = {"path": path, "schema": table.schema}
+            except Exception as e:
+                # The query itself succeeded; keep the results in memory
+                logger.error(f"Could not spill last query results to {path}: {e}")
+                _remove_file(path)
+
+        with self._last_results_lock:
+            previous = self.last_query_results
+            self.last_query_results = last_results
+        if previous and "path" in previous:
+            _remove_file(previous["path"])
+
+    def _discard_last_results(self) -> None:
+        with self._last_results_lock:
+            previous, self.last_query_results = self.last_query_results, None
+        if previous and "path" in previous:
+            _remove_file(previous["path"])
+
     def list_tables(self, datasets_filter) -> list[str]:
         """List all tables in the BigQuery database"""
+        cache_key = ("list_tables", datasets_filter)
+        cached = self._get_cached(self._metadata_cache, cache_key)
+        if cached is not None:
+            logger.debug(f"Using cached table list for {datasets_filter}")
+            return cached
+
         if datasets_filter:
             logger.debug("Listing {datasets_filter} tables")
             dataset_ref = self.client.dataset(datasets_filter)
@@ -97,71 +531,130 @@ class BigQueryDatabase:
 
         logger.debug(f"Found {len(datasets)} datasets")
 
+        # Datasets are listed concurrently; each call is one or more round-trips
         tables = []
-        for dataset in datasets:
-            dataset_tables = self.client.list_tables(dataset.dataset_id)
-            tables.extend(
-                [f"{dataset.dataset_id}.{table.table_id}" for table in dataset_tables]
-            )
+        for dataset_tables in self._metadata_executor.map(
+            self._list_dataset_tables, [dataset.dataset_id for dataset in datasets]
+        ):
+            tables.extend(dataset_tables)
 
         logger.debug(f"Found {len(tables)} tables")
+        self._set_cached(self._metadata_cache, cache_key, tables)
         return tables
 
+    def _list_dataset_tables(self, dataset_id: str) -> list[str]:
+        """List the tables of a single dataset as dataset.table names"""
+        return [
+            f"{dataset_id}.{table.table_id}"
+            for table in self.client.list_tables(dataset_id)
+        ]
+
     def describe_table(self, table_name: str) -> list[dict[str, Any]]:
         """Describe a table in the BigQuery database"""
         logger.debug(f"Describing table: {table_name}")
+        dataset_id, table_id = split_table_name(table_name)
+        return self._describe_tables(dataset_id, [table_id])[table_id]
+
+    def _describe_tables(
+        self, dataset_id: str, table_ids: list[str]
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Describe several tables of one dataset without running a query job"""
+        descriptions: dict[str, list[dict[str, Any]]] = {}
+        missing = []
+        for table_id in dict.fromkeys(table_ids):
+            cache_key = ("describe_table", f"{dataset_id}.{table_id}")
+            cached = self._get_cached(self._metadata_cache, cache_key)
+            if cached is not None:
+                descriptions[table_id] = cached
+            else:
+                missing.append(table_id)
 
-        parts = table_name.split(".")
-        if len(parts) != 2 and len(parts) != 3:
-            raise ValueError(f"Invalid table name: {table_name}")
+        if not missing:
+            logger.debug(f"Using cached descriptions for {dataset_id}: {table_ids}")
+            return descriptions
 
-        dataset_id = ".".join(parts[:-1])
-        table_id = parts[-1]
+        logger.debug(f"Describing {len(missing)} tables in {dataset_id}: {missing}")
+        # Table metadata is a plain REST GET per table, fetched concurrently
+        tables = self._metadata_executor.map(
+            lambda table_id: self._get_table(dataset_id, table_id), missing
+        )
+        # Missing tables and tables the renderer cannot describe in full
+        # (EXTERNAL, constraints, ...) are looked up in INFORMATION_SCHEMA
+        fallback = []
+        for table_id, table in zip(missing, tables):
+            if table is None or not _can_render_ddl(table):
+                fallback.append(table_id)
+            else:
+                descriptions[table_id] = [{"ddl": _render_ddl(table)}]
+
+        if fallback:
+            descriptions.update(self._query_table_ddl(dataset_id, fallback))
+
+        for table_id in missing:
+            # An empty description means the table does not exist (yet); do not
+            # cache that, or tables created elsewhere look missing until expiry
+            if descriptions[table_id]:
+                cache_key = ("describe_table", f"{dataset_id}.{table_id}")
+                self._set_cached(
+                    self._metadata_cache, cache_key, descriptions[table_id]
+                )
+        return descriptions
 
+    def _get_table(self, dataset_id: str, table_id: str) -> bigquery.Table | None:
+        try:
+            return self.client.get_table(f"{dataset_id}.{table_id}")
+        except NotFound:
+            return None
+
+    def _query_table_ddl(
+        self, dataset_id: str, table_ids: list[str]
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Look up table DDL in INFORMATION_SCHEMA with a single query"""
+        logger.debug(f"Querying INFORMATION_SCHEMA for {dataset_id}: {table_ids}")
         query = f"""
-            SELECT ddl
+            SELECT table_name, ddl
             FROM {dataset_id}.INFORMATION_SCHEMA.TABLES
-            WHERE table_name = @table_name;
+            WHERE table_name IN UNNEST(@table_names);
         """
-        return self.execute_query(
+        # Internal lookup: must not replace the user's last query results
+        table = self._run_query(
             query,
             params=[
-                bigquery.ScalarQueryParameter("table_name", "STRING", table_id),
+                bigquery.ArrayQueryParameter("table_names", "STRING", table_ids),
             ],
         )
 
+        # Read the two columns directly rather than materializing a dict per row
+        found: dict[str, list[dict[str, Any]]] = {}
+        for name, ddl in zip(
+            table.column("table_name").to_pylist(), table.column("ddl").to_pylist()
+        ):
+            found.setdefault(name, []).append({"ddl": ddl})
+
+        return {table_id: found.get(table_id, []) for table_id in table_ids}
+
     def save_query_to_csv_file(
-        self, query: str, file_path: str, params: dict[str, Any] | None = None
+        self, query: str, file_path: str, params: QueryParams | None = None
     ) -> str:
         """Execute a SQL query and save results to a CSV file"""
         logger.debug(f"Executing query and saving to CSV file: {file_path}")
         try:
-            if params:
-                job = self.client.query(
-                    query, job_config=bigquery.QueryJobConfig(query_parameters=params)
-                )
-            else:
-                job = self.client.query(query)
+            job = self.client.query(
+                query, job_config=_query_job_config(_normalize_params(params))
+            )
 
             results = job.result()
+            self._invalidate_cache_after(job)
 
             # Ensure directory exists
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
-            # Write to CSV file
-            with open(file_path, "w", newline="", encoding="utf-8") as csvfile:
-                writer = csv.writer(csvfile)
-
-                # Write headers
-                if results.schema:
-                    headers = [field.name for field in results.schema]
-                    writer.writerow(headers)
-
-                # Write data rows
-                row_count = 0
-                for row in results:
-                    writer.writerow(list(row.values()))
-                    row_count += 1
+            # Stream Arrow record batches straight into the CSV file
+            row_count = _write_batches_to_csv(
+                file_path,
+                self._iter_arrow_batches(job, results),
+                [field.name for field in results.schema],
+            )
 
             logger.debug(
                 f"Query results saved to CSV file: {file_path} with {row_count} rows"
@@ -173,7 +666,15 @@ class BigQueryDatabase:
 
     def save_last_results_to_csv_file(self, file_path: str) -> str:
         """Save the last query results to a CSV file"""
-        if not self.last_query_results:
+        with self._last_results_lock:
+            last_results = self.last_query_results
+            # Map the file while holding the lock so it cannot be replaced first
+            source = (
+                pa.memory_map(last_results["path"])
+                if last_results and "path" in last_results
+                else None
+            )
+        if last_results is None:
             raise ValueError(
                 "No previous query results available. Execute a query first."
             )
@@ -183,22 +684,20 @@ class BigQueryDatabase:
             # Ensure directory exists
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
-            # Write to CSV file
-            with open(file_path, "w", newline="", encoding="utf-8") as csvfile:
-                writer = csv.writer(csvfile)
-
-                # Write headers
-                if self.last_query_results["schema"]:
-                    headers = [
-                        field.name for field in self.last_query_results["schema"]
-                    ]
-                    writer.writerow(headers)
-
-                # Write data rows
-                row_count = 0
-                for row in self.last_query_results["rows"]:
-                    writer.writerow(list(row.values()))
-                    row_count += 1
+            if source is None:
+                table = last_results["table"]
+                row_count = _write_batches_to_csv(
+                    file_path, table.to_batches(), table.schema.names
+                )
+            else:
+                # Stream record batches from the memory-mapped IPC file
+                with source:
+                    reader = pa.ipc.open_file(source)
+                    row_count = _write_batches_to_csv(
+                        file_path,
+                        (reader.get_batch(i) for i in range(reader.num_record_batches)),
+                        last_results["schema"].names,
+                    )
 
             logger.debug(
                 f"Last query results saved to CSV file: {file_path} with {row_count} rows"
@@ -1,3 +1,12 @@
+import asyncio
+import base64
+import contextlib
+import functools
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
+import pyarrow as pa
 import uvicorn
 from mcp.server import Server
 from mcp.server.sse import SseServerTransport
@@ -13,114 +22,165 @@ from typing import Any
 # Initialize FastMCP server for Weather tools (SSE)
 from .bigqueryOp import BigQueryDatabase
 
+# BigQuery client calls are blocking; run them off the event loop on a bounded
+# pool so one slow query does not stall every other SSE connection.
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="bigquery")
 
-def create_starlette_app(db_project, db_location, db_key_file) -> Starlette:
-    """Create a Starlette application that can server the provied mcp server with SSE."""
+# Largest number of rows returned inline by execute-query
+MAX_PREVIEW_ROWS = 1000
 
-    sse = SseServerTransport("/messages/")
-    server = Server("bigquery-manager")
-    db = BigQueryDatabase(db_project, db_location, db_key_file)
 
-    @server.list_tools()
-    async def handle_list_tools() -> list[types.Tool]:
-        """List available tools"""
-        return [
-            types.Tool(
-                name="execute-query",
-                description="Execute a SELECT query on the BigQuery database",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "SELECT SQL query to execute using BigQuery dialect",
-                        },
-                    },
-                    "required": ["query"],
+# Tool definitions are static, so build them once rather than per list_tools call
+TOOLS: tuple[types.Tool, ...] = (
+    types.Tool(
+        name="execute-query",
+        description="Execute a SELECT query on the BigQuery database",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "SELECT SQL query to execute using BigQuery dialect",
+                },
+            },
+            "required": ["query"],
+        },
+    ),
+    types.Tool(
+        name="list-tables",
+        description="List all tables in the BigQuery database",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "datasets_filter": {
+                    "type": "string",
+                    "description": "Optional filter for datasets (e.g., 'my_dataset')",
+                }
+            },
+        },
+    ),
+    types.Tool(
+        name="describe-table",
+        description="Get the schema information for a specific table",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "table_name": {
+                    "type": "string",
+                    "description": "Name of the table to describe (e.g. my_dataset.my_table)",
+                },
+            },
+            "required": ["table_name"],
+        },
+    ),
+    types.Tool(
+        name="save-csv-file",
+        description="Execute a SELECT query and save results to a CSV file",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "SELECT SQL query to execute and save as CSV",
                 },
-            ),
-            types.Tool(
-                name="list-tables",
-                description="List all tables in the BigQuery database",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "datasets_filter": {
-                            "type": "string",
-                            "description": "Optional filter for datasets (e.g., 'my_dataset')",
-                        }
-                    },
+                "file_path": {
+                    "type": "string",
+                    "description": "Path where to save the CSV file (e.g., /path/to/data.csv)",
                 },
-            ),
-            types.Tool(
-                name="describe-table",
-                description="Get the schema information for a specific table",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "table_name": {
-                            "type": "string",
-                            "description": "Name of the table to describe (e.g. my_dataset.my_table)",
-                        },
-                    },
-                    "required": ["table_name"],
+            },
+            "required": ["query", "file_path"],
+        },
+    ),
+    types.Tool(
+        name="save-last-results-csv",
+        description="Save the last query results to a CSV file without re-running the query",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_path": {
+                    "type": "string",
+                    "description": "Path where to save the CSV file (e.g., /path/to/data.csv)",
                 },
-            ),
-            types.Tool(
-                name="save-csv-file",
-                description="Execute a SELECT query and save results to a CSV file",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "SELECT SQL query to execute and save as CSV",
-                        },
-                        "file_path": {
-                            "type": "string",
-                            "description": "Path where to save the CSV file (e.g., /path/to/data.csv)",
-                        },
-                    },
-                    "required": ["query", "file_path"],
+            },
+            "required": ["file_path"],
+        },
+    ),
+    types.Tool(
+        name="save-csv-auto",
+        description="Execute a SELECT query and save results to an auto-generated CSV file with timestamp",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "SELECT SQL query to execute and save as CSV",
                 },
-            ),
-            types.Tool(
-                name="save-last-results-csv",
-                description="Save the last query results to a CSV file without re-running the query",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "file_path": {
-                            "type": "string",
-                            "description": "Path where to save the CSV file (e.g., /path/to/data.csv)",
-                        },
-                    },
-                    "required": ["file_path"],
+                "directory": {
+                    "type": "string",
+                    "description": "Directory where to save the CSV file (default: current directory)",
                 },
-            ),
-            types.Tool(
-                name="save-csv-auto",
-                description="Execute a SELECT query and save results to an auto-generated CSV file with timestamp",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "SELECT SQL query to execute and save as CSV",
-                        },
-                        "directory": {
-                            "type": "string",
-                            "description": "Directory where to save the CSV file (default: current directory)",
-                        },
-                        "base_name": {
-                            "type": "string",
-                            "description": "Base name for the CSV file (default: 'bigquery_export')",
-                        },
-                    },
-                    "required": ["query"],
+                "base_name": {
+                    "type": "string",
+                    "description": "Base name for the CSV file (default: 'bigquery_export')",
                 },
-            ),
-        ]
+            },
+            "required": ["query"],
+        },
+    ),
+)
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking callable on the BigQuery worker pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor, functools.partial(func, *args, **kwargs)
+    )
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize values orjson does not handle natively (BYTES, NUMERIC, ...)"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        # BigQuery's own JSON representation of BYTES is base64
+        return base64.b64encode(value).decode("ascii")
+    return str(value)
+
+
+def to_json_text(value: Any) -> str:
+    """Serialize a tool result to JSON text
+
+    Naive datetimes (BigQuery DATETIME, civil time) are written without an
+    offset; TIMESTAMP values are tz-aware and keep theirs.
+    """
+    return orjson.dumps(
+        value, option=orjson.OPT_SERIALIZE_NUMPY, default=_json_default
+    ).decode()
+
+
+def format_query_results(table: pa.Table) -> str:
+    """Render at most MAX_PREVIEW_ROWS rows of a query result as JSON text"""
+    text = to_json_text(table.slice(0, MAX_PREVIEW_ROWS).to_pylist())
+    if table.num_rows > MAX_PREVIEW_ROWS:
+        text += (
+            f"\n(Showing first {MAX_PREVIEW_ROWS} of {table.num_rows} rows. "
+            "Use save-last-results-csv to export all rows.)"
+        )
+    return text
+
+
+def create_starlette_app(
+    db_project, db_location, db_key_file, db_pool_size=64
+) -> Starlette:
+    """Create a Starlette application that can server the provied mcp server with SSE."""
+
+    sse = SseServerTransport("/messages/")
+    server = Server("bigquery-manager")
+    db = BigQueryDatabase(db_project, db_location, db_key_file, db_pool_size)
+
+    @server.list_tools()
+    async def handle_list_tools() -> list[types.Tool]:
+        """List available tools"""
+        return list(TOOLS)
 
     @server.call_tool()
     async def handle_call_tool(
@@ -129,14 +189,16 @@ def create_starlette_app(db_project, db_location, db_key_file) -> Starlette:
         """Handle tool execution requests"""
         try:
             if name == "list-tables":
-                results = db.list_tables(arguments["datasets_filter"])
-                return [types.TextContent(type="text", text=str(results))]
+                results = await run_blocking(
+                    db.list_tables, arguments["datasets_filter"]
+                )
+                return [types.TextContent(type="text", text=to_json_text(results))]
 
             elif name == "describe-table":
                 if not arguments or "table_name" not in arguments:
                     raise ValueError("Missing table_name argument")
-                results = db.describe_table(arguments["table_name"])
-                return [types.TextContent(type="text", text=str(results))]
+                results = await run_blocking(db.describe_table, arguments["table_name"])
+                return [types.TextContent(type="text", text=to_json_text(results))]
 
             elif name == "save-csv-file":
                 if (
@@ -145,15 +207,19 @@ def create_starlette_app(db_project, db_location, db_key_file) -> Starlette:
                     or "file_path" not in arguments
                 ):
                     raise ValueError("Missing query or file_path argument")
-                result = db.save_query_to_csv_file(
-                    arguments["query"], arguments["file_path"]
+                result = await run_blocking(
+                    db.save_query_to_csv_file,
+                    arguments["query"],
+                    arguments["file_path"],
                 )
                 return [types.TextContent(type="text", text=result)]
 
             elif name == "save-last-results-csv":
                 if not arguments or "file_path" not in arguments:
                     raise ValueError("Missing file_path argument")
-                result = db.save_last_results_to_csv_file(arguments["file_path"])
+                result = await run_blocking(
+                    db.save_last_results_to_csv_file, arguments["file_path"]
+                )
                 return [types.TextContent(type="text", text=result)]
 
             elif name == "save-csv-auto":
@@ -165,14 +231,18 @@ def create_starlette_app(db_project, db_location, db_key_file) -> Starlette:
                 filename = db.generate_csv_filename(base_name)
                 file_path = os.path.join(directory, filename)
 
-                result = db.save_query_to_csv_file(arguments["query"], file_path)
+                result = await run_blocking(
+                    db.save_query_to_csv_file, arguments["query"], file_path
+                )
                 return [types.TextContent(type="text", text=result)]
 
             elif name == "execute-query":
                 if not arguments or "query" not in arguments:
                     raise ValueError("Missing query argument")
-                results = db.execute_query(arguments["query"])
-                return [types.TextContent(type="text", text=str(results))]
+                results = await run_blocking(db.execute_query, arguments["query"])
+                # Row conversion and serialization also stay off the event loop
+                text = await run_blocking(format_query_results, results)
+                return [types.TextContent(type="text", text=text)]
 
             else:
                 raise ValueError(f"Unknown tool: {name}")
@@ -191,12 +261,20 @@ def create_starlette_app(db_project, db_location, db_key_file) -> Starlette:
                 server.create_initialization_options(),
             )
 
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette):
+        try:
+            yield
+        finally:
+            db.close()
+
     return Starlette(
         debug=True,
         routes=[
             Route("/sse", endpoint=handle_sse),
             Mount("/messages/", app=sse.handle_post_message),
         ],
+        lifespan=lifespan,
     )
 
 
@@ -206,8 +284,20 @@ def main(
     db_key_file: str = None,
     host: str = "localhost",
     port: int = 8080,
+    db_pool_size: int = 64,
 ) -> None:
     """Main entry point to run the MCP SSE server."""
-    starlette_app = create_starlette_app(db_project, db_location, db_key_file)
+    starlette_app = create_starlette_app(
+        db_project, db_location, db_key_file, db_pool_size
+    )
 
-    uvicorn.run(starlette_app, host=host, port=port)
+    # uvloop is not available on Windows
+    loop = "asyncio" if sys.platform == "win32" else "uvloop"
+    uvicorn.run(
+        starlette_app,
+        host=host,
+        port=port,
+        loop=loop,
+        http="httptools",
+        workers=1,
+    )
@@ -0,0 +1,432 @@
+import csv
+import enum
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest import mock
+
+import pyarrow as pa
+import pytest
+from google.api_core.exceptions import NotFound, PermissionDenied
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import bigquery
+
+from mcp_bq_sse.bigqueryOp import (
+    BigQueryDatabase,
+    _can_render_ddl,
+    _normalize_params,
+    _render_ddl,
+    _write_batches_to_csv,
+)
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def test_write_batches_to_csv_streams_all_batches(tmp_path):
+    path = tmp_path / "out.csv"
+    batch = pa.record_batch({"id": [1, 2], "name": ["a,b", None]})
+
+    row_count = _write_batches_to_csv(str(path), [batch, batch], ["id", "name"])
+
+    assert row_count == 4
+    assert read_csv(path) == [
+        ["id", "name"],
+        ["1", "a,b"],
+        ["2", ""],
+        ["1", "a,b"],
+        ["2", ""],
+    ]
+
+
+def test_write_batches_to_csv_writes_header_for_empty_result(tmp_path):
+    path = tmp_path / "out.csv"
+
+    row_count = _write_batches_to_csv(str(path), [], ["id", "name"])
+
+    assert row_count == 0
+    assert read_csv(path) == [["id", "name"]]
+
+
+def test_write_batches_to_csv_json_encodes_nested_columns(tmp_path):
+    path = tmp_path / "out.csv"
+    batch = pa.record_batch(
+        {
+            "id": [1, 2],
+            "tags": pa.array([[1, 2], None], pa.list_(pa.int64())),
+            "info": pa.array([{"x": 1, "y": "a"}, None]),
+        }
+    )
+
+    row_count = _write_batches_to_csv(str(path), [batch], ["id", "tags", "info"])
+
+    assert row_count == 2
+    header, first, second = read_csv(path)
+    assert header == ["id", "tags", "info"]
+    assert first[0] == "1"
+    assert json.loads(first[1]) == [1, 2]
+    assert json.loads(first[2]) == {"x": 1, "y": "a"}
+    assert second == ["2", "", ""]
+
+
+@pytest.fixture
+def db():
+    with mock.patch(
+        "google.auth.default", return_value=(AnonymousCredentials(), "project")
+    ):
+        database = BigQueryDatabase("project", "US", None)
+    yield database
+    database.close()
+
+
+def test_download_arrow_falls_back_to_rest_without_storage_permission(db):
+    table = pa.table({"id": [1, 2]})
+    denied = mock.Mock()
+    denied.to_arrow.side_effect = PermissionDenied("readsessions.create")
+    job = mock.Mock()
+    job.result.return_value.to_arrow.return_value = table
+
+    assert db._download_arrow(job, denied) == table
+    job.result.return_value.to_arrow.assert_called_once_with(
+        create_bqstorage_client=False
+    )
+
+    # Later downloads skip the Storage API entirely
+    rows = mock.Mock()
+    rows.to_arrow.return_value = table
+    assert db._download_arrow(job, rows) == table
+    rows.to_arrow.assert_not_called()
+
+
+def test_iter_arrow_batches_falls_back_to_rest_without_storage_permission(db):
+    batch = pa.record_batch({"id": [1, 2]})
+
+    def denied_batches():
+        raise PermissionDenied("readsessions.create")
+        yield
+
+    rows = mock.Mock()
+    rows.to_arrow_iterable.return_value = denied_batches()
+    job = mock.Mock()
+    job.result.return_value.to_arrow_iterable.return_value = iter([batch])
+
+    assert list(db._iter_arrow_batches(job, rows)) == [batch]
+    assert not db._use_bqstorage
+
+
+def test_render_ddl_quotes_identifiers_and_renders_column_types():
+    table = bigquery.Table(
+        "project.dataset.events",
+        schema=[
+            bigquery.SchemaField("select", "INTEGER", "REQUIRED", description="Id"),
+            bigquery.SchemaField("tags", "STRING", "REPEATED"),
+            bigquery.SchemaField("amount", "NUMERIC", precision=10, scale=2),
+            bigquery.SchemaField("period", "RANGE", range_element_type="DATE"),
+            bigquery.SchemaField(
+                "info",
+                "RECORD",
+                fields=[
+                    bigquery.SchemaField("x", "FLOAT"),
+                    bigquery.SchemaField("order", "BOOLEAN"),
+                ],
+            ),
+            bigquery.SchemaField(
+                "ts", "TIMESTAMP", default_value_expression="CURRENT_TIMESTAMP()"
+            ),
+        ],
+    )
+    table._properties["type"] = "TABLE"
+
+    assert _render_ddl(table) == (
+        "CREATE TABLE `project.dataset.events`\n"
+        "(\n"
+        '  `select` INT64 NOT NULL OPTIONS(description="Id"),\n'
+        "  `tags` ARRAY<STRING>,\n"
+        "  `amount` NUMERIC(10, 2),\n"
+        "  `period` RANGE<DATE>,\n"
+        "  `info` STRUCT<`x` FLOAT64, `order` BOOL>,\n"
+        "  `ts` TIMESTAMP DEFAULT CURRENT_TIMESTAMP()\n"
+        ");"
+    )
+
+
+def test_render_ddl_includes_partitioning_clustering_and_options():
+    table = bigquery.Table(
+        "project.dataset.events",
+        schema=[
+            bigquery.SchemaField("ts", "TIMESTAMP"),
+            bigquery.SchemaField("group", "STRING"),
+        ],
+    )
+    table._properties["type"] = "TABLE"
+    table.time_partitioning = bigquery.TimePartitioning(
+        field="ts", expiration_ms=7 * 86_400_000
+    )
+    table.require_partition_filter = True
+    table.clustering_fields = ["group"]
+    table.description = "Events"
+    table.labels = {"team": "data"}
+    table.expires = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    table.encryption_configuration = bigquery.EncryptionConfiguration(
+        "projects/p/keys/k"
+    )
+
+    assert _render_ddl(table) == (
+        "CREATE TABLE `project.dataset.events`\n"
+        "(\n"
+        "  `ts` TIMESTAMP,\n"
+        "  `group` STRING\n"
+        ")\n"
+        "PARTITION BY DATE(`ts`)\n"
+        "CLUSTER BY `group`\n"
+        'OPTIONS(expiration_timestamp=TIMESTAMP "2030-01-01T00:00:00+00:00", '
+        "partition_expiration_days=7.0, require_partition_filter=true, "
+        'kms_key_name="projects/p/keys/k", description="Events", '
+        'labels=[("team", "data")]);'
+    )
+
+
+def test_render_ddl_renders_views():
+    view = bigquery.Table("project.dataset.recent")
+    view.view_query = "SELECT 1"
+    view._properties["type"] = "VIEW"
+
+    assert _render_ddl(view) == "CREATE VIEW `project.dataset.recent`\nAS SELECT 1;"
+
+
+def test_render_ddl_renders_materialized_view_refresh_options():
+    view = bigquery.Table("project.dataset.daily")
+    view.mview_query = "SELECT 1"
+    view.mview_enable_refresh = False
+    view.mview_refresh_interval = timedelta(hours=1)
+    view._properties["type"] = "MATERIALIZED_VIEW"
+
+    assert _render_ddl(view) == (
+        "CREATE MATERIALIZED VIEW `project.dataset.daily`\n"
+        "OPTIONS(enable_refresh=false, refresh_interval_minutes=60.0)\n"
+        "AS SELECT 1;"
+    )
+
+
+def _table(table_type="TABLE", schema=()):
+    table = bigquery.Table("project.dataset.events", schema=list(schema))
+    table._properties["type"] = table_type
+    return table
+
+
+def test_can_render_ddl_accepts_plain_tables():
+    assert _can_render_ddl(_table(schema=[bigquery.SchemaField("id", "INT64")]))
+
+
+@pytest.mark.parametrize(
+    "table",
+    [
+        _table("EXTERNAL"),
+        _table("SNAPSHOT"),
+        _table(
+            schema=[
+                bigquery.SchemaField("n", "NUMERIC", rounding_mode="ROUND_HALF_EVEN")
+            ]
+        ),
+        _table(
+            schema=[
+                bigquery.SchemaField(
+                    "info",
+                    "RECORD",
+                    fields=[
+                        bigquery.SchemaField(
+                            "ssn",
+                            "STRING",
+                            policy_tags=bigquery.PolicyTagList(["projects/p/tag"]),
+                        )
+                    ],
+                )
+            ]
+        ),
+    ],
+)
+def test_can_render_ddl_rejects_unrendered_properties(table):
+    assert not _can_render_ddl(table)
+
+
+def test_can_render_ddl_rejects_constraints_and_max_staleness():
+    constrained = _table()
+    constrained._properties["tableConstraints"] = {"primaryKey": {"columns": ["id"]}}
+    stale = _table()
+    stale.max_staleness = "0-0 0 4:0:0"
+
+    assert not _can_render_ddl(constrained)
+    assert not _can_render_ddl(stale)
+
+
+def test_describe_tables_uses_information_schema_for_unrenderable_types(db):
+    table = bigquery.Table("project.dataset.events", schema=[])
+    table._properties["type"] = "TABLE"
+    external = bigquery.Table("project.dataset.files")
+    external._properties["type"] = "EXTERNAL"
+    db.client = mock.Mock()
+    db.client.get_table.side_effect = lambda name: {
+        "dataset.events": table,
+        "dataset.files": external,
+    }[name]
+    db._query_table_ddl = mock.Mock(
+        return_value={"files": [{"ddl": "CREATE EXTERNAL"}]}
+    )
+
+    descriptions = db._describe_tables("dataset", ["events", "files"])
+
+    assert descriptions["files"] == [{"ddl": "CREATE EXTERNAL"}]
+    assert descriptions["events"][0]["ddl"].startswith("CREATE TABLE")
+    db._query_table_ddl.assert_called_once_with("dataset", ["files"])
+
+
+def test_query_table_ddl_keeps_last_query_results(db):
+    results = pa.table({"id": [1, 2]})
+    db._download_arrow = mock.Mock(
+        side_effect=[
+            results,
+            pa.table({"table_name": ["events"], "ddl": ["CREATE TABLE events"]}),
+        ]
+    )
+    db.client = mock.Mock()
+
+    db.execute_query("SELECT id FROM dataset.events")
+    ddl = db._query_table_ddl("dataset", ["events"])
+
+    assert ddl == {"events": [{"ddl": "CREATE TABLE events"}]}
+    assert db.last_query_results == {"table": results}
+
+
+class Color(enum.IntEnum):
+    RED = 1
+
+
+def test_normalize_params_infers_types_from_a_dict():
+    params = _normalize_params(
+        {
+            "naive": datetime(2024, 1, 1, 9, 30),
+            "aware": datetime(2024, 1, 1, 9, 30, tzinfo=timezone.utc),
+            "numeric": Decimal("1.5"),
+            "bignumeric": Decimal("1.0123456789"),
+            "color": Color.RED,
+            "missing": None,
+        }
+    )
+
+    assert [(p.name, p.type_) for p in params] == [
+        ("naive", "DATETIME"),
+        ("aware", "TIMESTAMP"),
+        ("numeric", "NUMERIC"),
+        ("bignumeric", "BIGNUMERIC"),
+        ("color", "INT64"),
+        ("missing", "STRING"),
+    ]
+
+
+def test_normalize_params_builds_array_parameters():
+    ids, empty, sparse = _normalize_params(
+        {"ids": [1, 2], "empty": [], "sparse": (None, "a")}
+    )
+
+    assert isinstance(ids, bigquery.ArrayQueryParameter)
+    assert (ids.array_type, ids.values) == ("INT64", [1, 2])
+    assert (empty.array_type, empty.values) == ("STRING", [])
+    assert (sparse.array_type, sparse.values) == ("STRING", [None, "a"])
+
+
+def test_normalize_params_passes_lists_through():
+    param = bigquery.ScalarQueryParameter("id", "INT64", 1)
+
+    assert _normalize_params([param]) == [param]
+    assert _normalize_params(None) == []
+
+
+def test_normalize_params_rejects_unsupported_types():
+    with pytest.raises(ValueError, match="'value': object"):
+        _normalize_params({"value": object()})
+
+
+def test_store_last_results_keeps_small_results_in_memory(db, tmp_path):
+    table = pa.table({"id": [1, 2]})
+
+    db._store_last_results(table)
+    message = db.save_last_results_to_csv_file(str(tmp_path / "out.csv"))
+
+    assert db.last_query_results == {"table": table}
+    assert message == f"Successfully saved 2 rows to {tmp_path / 'out.csv'}"
+    assert read_csv(tmp_path / "out.csv") == [["id"], ["1"], ["2"]]
+
+
+def test_save_last_results_reads_back_spilled_file(db, tmp_path):
+    with mock.patch("mcp_bq_sse.bigqueryOp._SPILL_THRESHOLD_BYTES", 0):
+        db._store_last_results(pa.table({"id": [1, 2], "name": ["a", None]}))
+    path = db.last_query_results["path"]
+
+    db.save_last_results_to_csv_file(str(tmp_path / "out.csv"))
+
+    assert read_csv(tmp_path / "out.csv") == [["id", "name"], ["1", "a"], ["2", ""]]
+    db._discard_last_results()
+    assert not os.path.exists(path)
+
+
+def test_store_last_results_keeps_rows_when_spill_fails(db, tmp_path):
+    table = pa.table({"id": [1, 2]})
+    with (
+        mock.patch("mcp_bq_sse.bigqueryOp._SPILL_THRESHOLD_BYTES", 0),
+        mock.patch("tempfile.tempdir", str(tmp_path)),
+        mock.patch.object(
+            pa.ipc, "new_file", side_effect=OSError("No space left on device")
+        ),
+    ):
+        db._store_last_results(table)
+
+    assert db.last_query_results == {"table": table}
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_describe_tables_serves_repeat_calls_from_cache(db):
+    db.client = mock.Mock()
+    db.client.get_table.return_value = _table(
+        schema=[bigquery.SchemaField("id", "INT64")]
+    )
+
+    first = db.describe_table("dataset.events")
+    second = db.describe_table("dataset.events")
+
+    assert first == second
+    db.client.get_table.assert_called_once_with("dataset.events")
+
+
+def test_describe_tables_does_not_cache_missing_tables(db):
+    db.client = mock.Mock()
+    db.client.get_table.side_effect = NotFound("events")
+    db._query_table_ddl = mock.Mock(return_value={"events": []})
+
+    assert db.describe_table("dataset.events") == []
+    assert db.describe_table("dataset.events") == []
+    assert db._query_table_ddl.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "statement_type", ["CREATE_TABLE", "DROP_TABLE", "ALTER_TABLE", "SCRIPT"]
+)
+def test_ddl_jobs_invalidate_metadata_cache(db, statement_type):
+    db._set_cached(db._metadata_cache, ("list_tables", None), ["dataset.events"])
+
+    db._invalidate_cache_after(mock.Mock(statement_type=statement_type))
+
+    assert db._get_cached(db._metadata_cache, ("list_tables", None)) is None
+
+
+@pytest.mark.parametrize("statement_type", ["SELECT", "INSERT", None])
+def test_other_jobs_keep_metadata_cache(db, statement_type):
+    db._set_cached(db._metadata_cache, ("list_tables", None), ["dataset.events"])
+
+    db._invalidate_cache_after(mock.Mock(statement_type=statement_type))
+
+    assert db._get_cached(db._metadata_cache, ("list_tables", None)) == [
+        "dataset.events"
+    ]
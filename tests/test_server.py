@@ -0,0 +1,48 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pyarrow as pa
+
+from mcp_bq_sse.server import MAX_PREVIEW_ROWS, format_query_results, to_json_text
+
+
+def test_to_json_text_keeps_datetime_civil_and_timestamp_zoned():
+    text = to_json_text(
+        {
+            "datetime": datetime(2024, 1, 1, 9, 30),
+            "timestamp": datetime(2024, 1, 1, 9, 30, tzinfo=timezone.utc),
+        }
+    )
+
+    assert json.loads(text) == {
+        "datetime": "2024-01-01T09:30:00",
+        "timestamp": "2024-01-01T09:30:00+00:00",
+    }
+
+
+def test_to_json_text_base64_encodes_bytes():
+    assert json.loads(
+        to_json_text({"bytes": b"\x00\x01", "numeric": Decimal("1.5")})
+    ) == {
+        "bytes": "AAE=",
+        "numeric": "1.5",
+    }
+
+
+def test_format_query_results_returns_all_rows_under_limit():
+    table = pa.table({"id": [1, 2]})
+
+    assert json.loads(format_query_results(table)) == [{"id": 1}, {"id": 2}]
+
+
+def test_format_query_results_truncates_with_note():
+    table = pa.table({"id": list(range(MAX_PREVIEW_ROWS + 5))})
+
+    rows, note = format_query_results(table).split("\n", 1)
+
+    assert len(json.loads(rows)) == MAX_PREVIEW_ROWS
+    assert note == (
+        f"(Showing first {MAX_PREVIEW_ROWS} of {MAX_PREVIEW_ROWS + 5} rows. "
+        "Use save-last-results-csv to export all rows.)"
+    )